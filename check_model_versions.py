@@ -1,6 +1,140 @@
 #!/usr/bin/env python3
+import contextlib
+import ctypes
+import io
+import platform
+import sys
 import tensorflow as tf
 
+from tflite_utils import load_xnnpack_delegates, max_op_version, read_op_versions
+
+# Analysis results keyed by model path; each flatbuffer is read and parsed once
+_analyses = {}
+
+def analyze(path):
+    """
+    Load a model into memory once and return its interpreter, op versions
+    and flatbuffer bytes
+    """
+    if path not in _analyses:
+        with open(path, 'rb') as f:
+            model_content = f.read()
+        interpreter = tf.lite.Interpreter(
+            model_content=model_content,
+            experimental_delegates=load_xnnpack_delegates()
+        )
+        interpreter.allocate_tensors()
+        _analyses[path] = (interpreter, read_op_versions(model_content), model_content)
+    return _analyses[path]
+
+def write_ops(ops):
+    """
+    Write the operation list in a single stdout call
+    """
+    lines = [f"  - {op['op_name']} (version {op['version']})" for op in ops]
+    sys.stdout.write("Operations used:\n" + "\n".join(lines) + "\n")
+
+GPU_DELEGATE_LIBS = {
+    'Linux': 'libtensorflowlite_gpu_delegate.so',
+    'Darwin': 'libtensorflowlite_gpu_delegate.dylib',
+    'Windows': 'tensorflowlite_gpu_delegate.dll',
+}
+
+def count_delegated_ops(model_content, delegate, num_ops):
+    """
+    Apply a delegate and return (ops it took over, partition count)
+    """
+    interpreter = tf.lite.Interpreter(
+        model_content=model_content,
+        experimental_delegates=[delegate],
+        experimental_op_resolver_type=tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    )
+    # Delegation keeps the original nodes (0..num_ops-1) and appends one
+    # DELEGATE node per partition; walk each partition back from its outputs
+    # to its inputs to find the original nodes it replaced
+    nodes = interpreter._get_ops_details()
+    producers = {int(t): node['index'] for node in nodes[:num_ops] for t in node['outputs']}
+    partitions = nodes[num_ops:]
+    delegated = set()
+    for partition in partitions:
+        boundary = {int(t) for t in partition['inputs']}
+        pending = [int(t) for t in partition['outputs']]
+        while pending:
+            t = pending.pop()
+            if t in boundary or t not in producers or producers[t] in delegated:
+                continue
+            delegated.add(producers[t])
+            pending.extend(int(i) for i in nodes[producers[t]]['inputs'])
+    return len(delegated), len(partitions)
+
+def analyzer_gpu_report(model_content):
+    """
+    Return the TFLite analyzer's report with GPU compatibility checks
+    """
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        tf.lite.experimental.Analyzer.analyze(model_content=model_content, gpu_compatibility=True)
+    return [line.strip() for line in report.getvalue().splitlines()]
+
+_analyzer_checks_gpu = None
+
+def analyzer_checks_gpu():
+    """
+    Whether this TF build's analyzer actually has a GPU compatibility checker.
+    Builds without one report every model as compatible, so probe with an
+    op the GPU delegate never supports.
+    """
+    global _analyzer_checks_gpu
+    if _analyzer_checks_gpu is None:
+        @tf.function(input_signature=[tf.TensorSpec([1, 4], tf.int32)] * 2)
+        def xor(a, b):
+            return tf.bitwise.bitwise_xor(a, b)
+        converter = tf.lite.TFLiteConverter.from_concrete_functions([xor.get_concrete_function()], xor)
+        lines = analyzer_gpu_report(converter.convert())
+        _analyzer_checks_gpu = any(line.startswith('GPU COMPATIBILITY WARNING:') for line in lines)
+    return _analyzer_checks_gpu
+
+def probe_gpu_delegate(model_content, ops):
+    """
+    Report how many ops the GPU delegate takes over. Uses the real delegate
+    when its library is present, else a static estimate from the analyzer.
+    """
+    lib = GPU_DELEGATE_LIBS.get(platform.system(), GPU_DELEGATE_LIBS['Linux'])
+    try:
+        # Probe with ctypes first: a failed load_delegate() leaves a
+        # half-built Delegate whose __del__ prints a traceback to stderr
+        ctypes.CDLL(lib)
+        delegate = tf.lite.experimental.load_delegate(lib)
+    except (OSError, ValueError):
+        delegate = None
+    
+    if delegate is not None:
+        try:
+            accepted, partitions = count_delegated_ops(model_content, delegate, len(ops))
+            print(f"GPU delegate accepted {accepted}/{len(ops)} ops in {partitions} partition(s)")
+            return
+        except (RuntimeError, ValueError) as e:
+            print(f"GPU delegate rejected the model ({e}), falling back to static analysis")
+    else:
+        print(f"GPU delegate library {lib} not found, falling back to static analysis")
+    
+    try:
+        if not analyzer_checks_gpu():
+            print("GPU compatibility not checked: this TF build's analyzer has no GPU checker")
+            return
+        lines = analyzer_gpu_report(model_content)
+    except (AttributeError, ValueError) as e:
+        print(f"GPU compatibility check not available ({e})")
+        return
+    
+    rejected_ops = sum(
+        1 for line in lines
+        if line.startswith('GPU COMPATIBILITY WARNING:')
+        and 'has GPU delegate compatibility issues' not in line
+    )
+    print(f"GPU compatibility (static estimate): {len(ops) - rejected_ops}/{len(ops)} ops eligible, "
+          f"{rejected_ops} would fall back to CPU")
+
 print("TensorFlow version:", tf.__version__)
 print("TensorFlow Lite version compatibility:")
 print("- TF 2.15+ uses FULLY_CONNECTED v12+ (incompatible with TFLite Flutter 0.11.0)")
@@ -12,8 +146,7 @@ print("\n" + "="*60)
 # Check your original model
 try:
     print("\nAnalyzing best_model.tflite...")
-    interpreter = tf.lite.Interpreter(model_path='assets/models/best_model.tflite')
-    interpreter.allocate_tensors()
+    interpreter, ops, model_content = analyze('assets/models/best_model.tflite')
     
     input_details = interpreter.get_input_details()
     output_details = interpreter.get_output_details()
@@ -21,19 +154,16 @@ try:
     print(f"Input shape: {input_details[0]['shape']}")
     print(f"Output shape: {output_details[0]['shape']}")
     
-    # Get operation details
-    ops = interpreter._get_ops_details()
-    print("Operations used:")
-    for op in ops:
-        op_name = op.get('op_name', 'Unknown')
-        version = op.get('version', 'Unknown')
-        print(f"  - {op_name} (version {version})")
-        
-        # Check if this is the problematic FULLY_CONNECTED v12
-        if op_name == 'FULLY_CONNECTED' and version == 12:
-            print("    ❌ INCOMPATIBLE: This version is not supported by TFLite Flutter 0.11.0")
-        elif op_name == 'FULLY_CONNECTED':
-            print(f"    ✅ COMPATIBLE: Version {version} should work")
+    write_ops(ops)
+    
+    # FULLY_CONNECTED v12+ (TF 2.15+) is not supported by TFLite Flutter 0.11.0
+    max_fc_version = max_op_version(ops, 'FULLY_CONNECTED')
+    if max_fc_version is not None and max_fc_version > 11:
+        print(f"❌ INCOMPATIBLE: FULLY_CONNECTED version {max_fc_version} is not supported by TFLite Flutter 0.11.0")
+    elif max_fc_version is not None:
+        print(f"✅ COMPATIBLE: FULLY_CONNECTED version {max_fc_version} should work")
+    
+    probe_gpu_delegate(model_content, ops)
             
 except Exception as e:
     print(f"❌ Error analyzing best_model.tflite: {e}")
@@ -43,8 +173,7 @@ print("\n" + "="*60)
 # Check minimal model
 try:
     print("\nAnalyzing minimal_model.tflite...")
-    interpreter2 = tf.lite.Interpreter(model_path='assets/models/minimal_model.tflite')
-    interpreter2.allocate_tensors()
+    interpreter2, ops2, model_content2 = analyze('assets/models/minimal_model.tflite')
     
     input_details2 = interpreter2.get_input_details()
     output_details2 = interpreter2.get_output_details()
@@ -52,12 +181,9 @@ try:
     print(f"Input shape: {input_details2[0]['shape']}")
     print(f"Output shape: {output_details2[0]['shape']}")
     
-    ops2 = interpreter2._get_ops_details()
-    print("Operations used:")
-    for op in ops2:
-        op_name = op.get('op_name', 'Unknown')
-        version = op.get('version', 'Unknown')
-        print(f"  - {op_name} (version {version})")
+    write_ops(ops2)
+    
+    probe_gpu_delegate(model_content2, ops2)
         
 except Exception as e:
     print(f"❌ Error analyzing minimal_model.tflite: {e}")
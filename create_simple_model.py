@@ -5,6 +5,7 @@ Quick fix: Create a simple compatible model for testing
 
 import tensorflow as tf
 import numpy as np
+import os
 
 def create_simple_compatible_model():
     """
@@ -12,7 +13,9 @@ def create_simple_compatible_model():
     """
     # Create a simple functional model
     inputs = tf.keras.Input(shape=(32000, 1), name='audio_input')
-    x = tf.keras.layers.GlobalAveragePooling1D()(inputs)
+    # Pool 64-sample windows so the Dense layers see 500 values, not 32000
+    x = tf.keras.layers.AveragePooling1D(pool_size=64, strides=64)(inputs)
+    x = tf.keras.layers.Flatten()(x)
     x = tf.keras.layers.Dense(64, activation='relu')(x)
     x = tf.keras.layers.Dense(32, activation='relu')(x)
     outputs = tf.keras.layers.Dense(3, activation='softmax', name='predictions')(x)
@@ -49,8 +52,8 @@ def create_simple_compatible_model():
         print("✅ Simple compatible model created!")
         print("File: assets/models/simple_compatible_model.tflite")
         
-        # Test the model
-        interpreter = tf.lite.Interpreter(model_content=tflite_model)
+        # Test the model (loaded from disk so the runtime can mmap it)
+        interpreter = tf.lite.Interpreter(model_path="assets/models/simple_compatible_model.tflite")
         interpreter.allocate_tensors()
         
         input_details = interpreter.get_input_details()
@@ -59,11 +62,36 @@ def create_simple_compatible_model():
         print(f"Input shape: {input_details[0]['shape']}")
         print(f"Output shape: {output_details[0]['shape']}")
         
-        return True
-        
     except Exception as e:
         print(f"❌ Failed to create model: {e}")
         return False
+    
+    # FP16 weights variant for GPU delegates (CPU dequantizes on load).
+    # Float16 weight quantization is only implemented in the MLIR converter,
+    # so this path cannot keep the legacy converter flags used above.
+    converter_fp16 = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter_fp16.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter_fp16.target_spec.supported_types = [tf.float16]
+    converter_fp16.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    converter_fp16.experimental_new_converter = True
+    
+    try:
+        tflite_model_fp16 = converter_fp16.convert()
+        
+        with open("assets/models/simple_compatible_model_fp16.tflite", "wb") as f:
+            f.write(tflite_model_fp16)
+        
+        fp32_size = os.path.getsize("assets/models/simple_compatible_model.tflite")
+        fp16_size = os.path.getsize("assets/models/simple_compatible_model_fp16.tflite")
+        print("✅ FP16 model created!")
+        print("File: assets/models/simple_compatible_model_fp16.tflite")
+        print(f"Size: {fp32_size / 1024:.1f} KB (FP32) -> {fp16_size / 1024:.1f} KB (FP16), "
+              f"{(1 - fp16_size / fp32_size) * 100:.0f}% smaller")
+        
+    except Exception as e:
+        print(f"⚠️ FP16 model not created (FP32 model is still usable): {e}")
+    
+    return True
 
 if __name__ == "__main__":
     print(f"TensorFlow version: {tf.__version__}")
@@ -4,8 +4,11 @@ Create a TensorFlow 2.12 compatible model
 """
 
 import tensorflow as tf
+import numpy as np
 import os
 
+from tflite_utils import max_op_version, read_op_versions
+
 # Force TensorFlow to use older op versions
 os.environ['TF_USE_LEGACY_KERAS'] = '1'
 
@@ -18,10 +21,11 @@ def create_compatible_model():
     inputs = tf.keras.Input(shape=(32000, 1), name='audio_input')
     
     # Simple architecture that should be compatible
-    x = tf.keras.layers.GlobalAveragePooling1D()(inputs)
-    x = tf.keras.layers.Dense(128, activation='relu', name='dense1')(x)
-    x = tf.keras.layers.Dropout(0.2)(x)
-    x = tf.keras.layers.Dense(64, activation='relu', name='dense2')(x)
+    # AVERAGE_POOL_2D (v2 once int8-quantized) instead of a full-length mean
+    x = tf.keras.layers.AveragePooling1D(pool_size=64, strides=64)(inputs)
+    x = tf.keras.layers.Flatten()(x)
+    # Two FULLY_CONNECTED ops are enough at this input size
+    x = tf.keras.layers.Dense(64, activation='relu', name='dense1')(x)
     x = tf.keras.layers.Dropout(0.2)(x) 
     outputs = tf.keras.layers.Dense(3, activation='softmax', name='predictions')(x)
     
@@ -36,16 +40,38 @@ def create_compatible_model():
     print("Model summary:")
     model.summary()
     
-    # Convert with strict compatibility for TFLite Flutter 0.11.0
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    # Representative samples used to calibrate the int8 ranges, generated
+    # in one vectorized call and prefetched while the converter runs
+    rng = np.random.default_rng(0)
+    calibration_data = rng.standard_normal((100, 1, 32000, 1), dtype=np.float32)
+    calibration_ds = tf.data.Dataset.from_tensor_slices(calibration_data).prefetch(tf.data.AUTOTUNE)
+    
+    def rep_ds():
+        for sample in calibration_ds:
+            yield [sample.numpy()]
+    
+    # Inference-only graph: same (shared) layers with the Dropouts left out
+    x = inputs
+    for layer in model.layers[1:]:
+        if not isinstance(layer, tf.keras.layers.Dropout):
+            x = layer(x)
+    inference_model = tf.keras.Model(inputs=inputs, outputs=x, name='audio_classifier_inference')
+    
+    # Convert with full-integer quantization for TFLite Flutter 0.11.0
+    converter = tf.lite.TFLiteConverter.from_keras_model(inference_model)
+    
+    # int8 weights and activations (FULLY_CONNECTED v11 has an int8 kernel)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = rep_ds
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
     
-    # Use minimal settings for maximum compatibility
-    converter.optimizations = []  # No optimizations to avoid new ops
-    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    # Per-channel Dense weights emit FULLY_CONNECTED v12 on TF 2.15+
+    converter._experimental_disable_per_channel_quantization_for_dense_layers = True
     
-    # Force older converter behavior
-    converter.experimental_new_converter = False
-    converter.experimental_new_quantizer = False
+    # The int8 path requires the MLIR converter
+    converter.experimental_new_converter = True
     
     # Additional compatibility flags
     converter.allow_custom_ops = False
@@ -62,33 +88,30 @@ def create_compatible_model():
         
         print(f"✅ Compatible model saved to: {output_path}")
         
-        # Test the model
-        interpreter = tf.lite.Interpreter(model_content=tflite_model)
+        # Test the model (loaded from disk so the runtime can mmap it)
+        interpreter = tf.lite.Interpreter(model_path=output_path)
         interpreter.allocate_tensors()
         
         input_details = interpreter.get_input_details()
         output_details = interpreter.get_output_details()
         
-        print(f"Input shape: {input_details[0]['shape']}")
-        print(f"Output shape: {output_details[0]['shape']}")
+        print(f"Input shape: {input_details[0]['shape']} ({input_details[0]['dtype'].__name__})")
+        print(f"Output shape: {output_details[0]['shape']} ({output_details[0]['dtype'].__name__})")
+        print(f"Model size: {len(tflite_model) / 1024:.1f} KB")
         
-        # Check operations
-        ops = interpreter._get_ops_details()
+        # Check operations (versions come from the flatbuffer)
+        ops = read_op_versions(tflite_model)
         print("Operations used:")
-        fully_connected_versions = []
         for op in ops:
-            op_name = op.get('op_name', 'Unknown')
-            version = op.get('version', 'Unknown')
-            print(f"  - {op_name} (v{version})")
-            if op_name == 'FULLY_CONNECTED':
-                fully_connected_versions.append(version)
+            print(f"  - {op['op_name']} (v{op['version']})")
         
-        if fully_connected_versions:
-            max_fc_version = max(fully_connected_versions)
+        max_fc_version = max_op_version(ops, 'FULLY_CONNECTED')
+        if max_fc_version is not None:
             if max_fc_version <= 11:
                 print(f"✅ FULLY_CONNECTED version {max_fc_version} - COMPATIBLE!")
             else:
                 print(f"❌ FULLY_CONNECTED version {max_fc_version} - INCOMPATIBLE!")
+                return False
         
         return True
         
@@ -105,6 +128,7 @@ if __name__ == "__main__":
         print("SUCCESS! Your compatible model is ready.")
         print("1. Update your Dart code to use 'best_model_compatible.tflite'")
         print("2. Or rename it to 'best_model.tflite' to replace the old one")
+        print("3. Input/output are int8 - quantize with the tensor's scale/zero point")
         print("="*60)
     else:
         print("\n❌ Failed to create compatible model")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Shared TFLite helpers for the model creation and checking scripts
+"""
+
+import ctypes
+
+import tensorflow as tf
+from tensorflow.lite.python import schema_py_generated as schema_fb
+from tensorflow.lite.python import schema_util
+
+# Builtin operator code -> name, e.g. 9 -> 'FULLY_CONNECTED'
+_BUILTIN_OP_NAMES = {
+    code: name for name, code in vars(schema_fb.BuiltinOperator).items()
+    if not name.startswith('_')
+}
+
+# XNNPACK delegate with a file-backed weights cache: packed weights are
+# written on the first run and mmap'd by later processes instead of being
+# repacked. This only takes effect with a standalone XNNPACK delegate build;
+# the stock wheel has none, so interpreters fall back to the built-in default.
+XNNPACK_DELEGATE_LIB = "libtensorflowlite_xnnpack_delegate.so"
+XNNPACK_CACHE_PATH = "xnn.cache"
+_xnnpack_load_error = None
+
+def load_xnnpack_delegates():
+    """
+    Return the XNNPACK delegate list, or [] to use the built-in default.
+    A missing library is detected once and remembered for later calls.
+    """
+    global _xnnpack_load_error
+    if _xnnpack_load_error is not None:
+        return []
+    try:
+        # Probe with ctypes first: a failed load_delegate() leaves a
+        # half-built Delegate whose __del__ prints a traceback to stderr
+        ctypes.CDLL(XNNPACK_DELEGATE_LIB)
+        delegate = tf.lite.experimental.load_delegate(
+            XNNPACK_DELEGATE_LIB, {"weight_cache_file_path": XNNPACK_CACHE_PATH}
+        )
+        return [delegate]
+    except (OSError, ValueError) as e:
+        _xnnpack_load_error = e
+        print(f"XNNPACK weights cache unavailable ({e}), using default delegate")
+        return []
+
+def read_op_versions(model_content):
+    """
+    Return [{'op_name', 'version'}] for each op in the main subgraph.
+    Interpreter._get_ops_details() does not expose op versions, so they
+    are read from the flatbuffer's operator codes instead.
+    """
+    model = schema_fb.Model.GetRootAsModel(model_content, 0)
+    subgraph = model.Subgraphs(0)
+    ops = []
+    for i in range(subgraph.OperatorsLength()):
+        op_code = model.OperatorCodes(subgraph.Operators(i).OpcodeIndex())
+        builtin_code = schema_util.get_builtin_code_from_operator_code(op_code)
+        if builtin_code == schema_fb.BuiltinOperator.CUSTOM:
+            op_name = op_code.CustomCode().decode()
+        else:
+            op_name = _BUILTIN_OP_NAMES.get(builtin_code, 'Unknown')
+        ops.append({'op_name': op_name, 'version': op_code.Version()})
+    return ops
+
+def max_op_version(ops, op_name):
+    """
+    Highest version of op_name in ops, or None if the op is not used
+    """
+    return max((op['version'] for op in ops if op['op_name'] == op_name), default=None)